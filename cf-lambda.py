@@ -1,14 +1,21 @@
 # cf-lambda.py
 from __future__ import annotations
+import functools
+import hashlib
+import ipaddress
 import json
 import os
+import re
 import time
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Set, Dict, Optional
 
 import boto3
+import urllib3
+from botocore.config import Config
+from botocore.credentials import CredentialProvider, DeferredRefreshableCredentials
 from botocore.exceptions import ClientError
+from botocore.session import get_session as get_botocore_session
 
 # ---------------- Cloudflare endpoints ----------------
 CF_V4_URL = "https://www.cloudflare.com/ips-v4"
@@ -26,26 +33,45 @@ UA_HEADERS_JSON = {
 
 HTTP_TIMEOUT = 30
 DESCR_DEFAULT = "Cloudflare IP"
-MAX_BATCH = 80          
+MAX_BATCH = 100         # AddEntries + RemoveEntries per modify call
 PL_DESCR_TRUNC = 100  
+OUTPUT_ITEMS_LIMIT = 500  # cap on added/removed CIDRs echoed to CloudWatch / returned
+PAGE_SIZE = 100         # MaxResults per page for EC2 describe/list paginators
+# Live version as reported in EC2 version-mismatch errors, e.g. "CurrentVersion is 7" / "current version: 7"
+_CURRENT_VERSION_RE = re.compile(r"current\s*version\s*(?:is|:)\s*(\d+)", re.IGNORECASE)
+HASH_CACHE_DIR = "/tmp"  # survives warm invocations of the same Lambda container
+
+# Module-level pool so warm invocations reuse keep-alive connections (CF + Slack)
+_HTTP = urllib3.PoolManager(
+    maxsize=4,
+    retries=urllib3.Retry(3, backoff_factor=0.2),
+    headers=UA_HEADERS_PLAIN,
+)
 
 # ---------------- Helpers ----------------
+_TRUTHY = frozenset({"1", "true", "yes", "y", "on"})
+
 def env_bool(name: str, default: bool = False) -> bool:
     val = os.getenv(name)
     if val is None:
         return default
-    return str(val).strip().lower() in ("1", "true", "yes", "y", "on")
+    return val.strip().casefold() in _TRUTHY
 
 def http_get(url: str, headers: Dict[str, str], timeout: int = HTTP_TIMEOUT) -> bytes:
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        return r.read()
+    r = _HTTP.request("GET", url, headers=headers, timeout=timeout)
+    if r.status >= 400:
+        raise urllib3.exceptions.HTTPError(f"GET {url} -> HTTP {r.status}")
+    return r.data
 
 def http_post_json(url: str, payload: Dict, timeout: int = 10) -> Tuple[int, str]:
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        return r.getcode(), r.read().decode("utf-8", "ignore")
+    r = _HTTP.request("POST", url, body=data, headers={"Content-Type": "application/json"},
+                      timeout=timeout, preload_content=False)
+    # Callers only need the status; don't read the body, just hand the socket back to the pool
+    code = r.status
+    r.drain_conn()
+    r.release_conn()
+    return code, ""
 
 def summarize_items(items: List[str], limit: int = 20) -> str:
     if not items:
@@ -54,112 +80,158 @@ def summarize_items(items: List[str], limit: int = 20) -> str:
         return ", ".join(items)
     return ", ".join(items[:limit]) + f", … (+{len(items)-limit} más)"
 
+def cap_items(items: List[str], limit: int = OUTPUT_ITEMS_LIMIT) -> List[str]:
+    if len(items) <= limit:
+        return items
+    return items[:limit] + [f"+{len(items)-limit} more"]
+
+def _sorted_cidrs(cidrs: List[str]) -> List[str]:
+    """Network order (IPv4 before IPv6) for human-facing output only."""
+    def key(c: str):
+        net = ipaddress.ip_network(c, strict=False)
+        return net.version, net.network_address.packed, net.prefixlen
+    return sorted(cidrs, key=key)
+
 # ---------------- Session / optional assume role ----------------
+_EC2_CFG = Config(
+    retries={"mode": "adaptive", "max_attempts": 10},
+    max_pool_connections=20,
+    tcp_keepalive=True,
+)
+
+class _AssumeRoleProvider(CredentialProvider):
+    """Credential provider yielding lazily-fetched, auto-refreshing assume-role credentials."""
+    METHOD = "cf-sts-assume-role"
+    CANONICAL_NAME = "cf-sts-assume-role"
+
+    def __init__(self, refresh_using):
+        super().__init__()
+        self._refresh_using = refresh_using
+
+    def load(self):
+        return DeferredRefreshableCredentials(refresh_using=self._refresh_using, method=self.METHOD)
+
 def _session_with_optional_assume() -> boto3.Session:
     role_arn = os.getenv("ASSUME_ROLE_ARN")
     region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
     if role_arn:
         base = boto3.client("sts", region_name=region)
-        creds = base.assume_role(RoleArn=role_arn, RoleSessionName="cfPrefixListUpdater")["Credentials"]
-        return boto3.Session(
-            aws_access_key_id=creds["AccessKeyId"],
-            aws_secret_access_key=creds["SecretAccessKey"],
-            aws_session_token=creds["SessionToken"],
-            region_name=region,
-        )
+
+        def _refresh() -> Dict[str, str]:
+            creds = base.assume_role(RoleArn=role_arn, RoleSessionName="cfPrefixListUpdater")["Credentials"]
+            return {
+                "access_key": creds["AccessKeyId"],
+                "secret_key": creds["SecretAccessKey"],
+                "token": creds["SessionToken"],
+                "expiry_time": creds["Expiration"].isoformat(),
+            }
+
+        # botocore assumes the role on first use and again shortly before expiry,
+        # so long-lived warm containers keep working
+        bs = get_botocore_session()
+        bs.get_component("credential_provider").insert_before("env", _AssumeRoleProvider(_refresh))
+        return boto3.Session(botocore_session=bs, region_name=region)
     return boto3.Session(region_name=region)
 
 SESSION = _session_with_optional_assume()
 STS = SESSION.client("sts")
-DEFAULT_EC2 = SESSION.client("ec2")
+DEFAULT_EC2 = SESSION.client("ec2", config=_EC2_CFG)
 ACCOUNT = STS.get_caller_identity()["Account"]
 DEFAULT_REGION = DEFAULT_EC2.meta.region_name
 
+@functools.lru_cache(maxsize=16)
+def _ec2_for_region(region: str) -> boto3.client:
+    if region == DEFAULT_REGION:
+        return DEFAULT_EC2
+    return SESSION.client("ec2", config=_EC2_CFG, region_name=region)
+
 def make_ec2(region: Optional[str]) -> boto3.client:
-    if region and region != DEFAULT_REGION:
-        return SESSION.client("ec2", region_name=region)
-    return DEFAULT_EC2
+    """One client per region for the container's lifetime (None means the default region)."""
+    return _ec2_for_region(region or DEFAULT_REGION)
 
 # ---------------- Cloudflare fetch ----------------
-def fetch_plain_lines(url: str) -> List[str]:
+def _norm_cidr(cidr: str) -> str:
+    """Canonical text form used on both sides of the diff (IPv6 is case-insensitive)."""
+    return cidr.strip().lower()
+
+def fetch_plain_lines(url: str) -> Set[str]:
     raw = http_get(url, UA_HEADERS_PLAIN)
-    out: List[str] = []
-    for b in raw.splitlines():
-        if not b or b.startswith(b"#"):
-            continue
-        out.append(b.decode("utf-8").strip())
-    return out
+    # Filter on bytes; only surviving CIDR lines (pure ASCII) are decoded
+    return {_norm_cidr(ln.decode("ascii")) for ln in raw.splitlines() if ln and not ln.startswith(b"#")}
 
-def fetch_via_api() -> Tuple[List[str], List[str]]:
+def fetch_via_api() -> Tuple[Set[str], Set[str]]:
     raw = http_get(CF_API_URL, UA_HEADERS_JSON)
     data = json.loads(raw.decode("utf-8"))
     res = data.get("result", {})
-    return res.get("ipv4_cidrs", []) or [], res.get("ipv6_cidrs", []) or []
+    return ({_norm_cidr(c) for c in res.get("ipv4_cidrs") or []},
+            {_norm_cidr(c) for c in res.get("ipv6_cidrs") or []})
 
-def fetch_cloudflare_ips() -> Tuple[List[str], List[str]]:
+def _result_or_none(future) -> Optional[Set[str]]:
     try:
-        v4 = fetch_plain_lines(CF_V4_URL)
-        v6 = fetch_plain_lines(CF_V6_URL)
-        if v4 or v6:
-            return v4, v6
-    except (urllib.error.HTTPError, urllib.error.URLError):
-        pass
-    return fetch_via_api()
+        return future.result() or None
+    except (urllib3.exceptions.HTTPError, ValueError):
+        # ValueError covers UnicodeDecodeError from a non-ASCII 200 body (BOM, HTML interstitial)
+        return None
+
+def fetch_cloudflare_ips() -> Tuple[Set[str], Set[str]]:
+    # Both lists live on the same host; fetch them concurrently over the pool
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f4 = ex.submit(fetch_plain_lines, CF_V4_URL)
+        f6 = ex.submit(fetch_plain_lines, CF_V6_URL)
+    v4, v6 = _result_or_none(f4), _result_or_none(f6)
+    if v4 and v6:
+        return v4, v6
+    # Only the missing family comes from the API; an empty list would wipe its PL
+    api_v4, api_v6 = fetch_via_api()
+    return v4 or api_v4, v6 or api_v6
 
 # ---------------- Prefix list discovery (support BOTH shapes) ----------------
 def _pls(resp: Dict) -> List[Dict]:
     """Normalize responses that may use 'ManagedPrefixLists' or 'PrefixLists'."""
     return (resp.get("ManagedPrefixLists") or resp.get("PrefixLists") or [])
 
-def _describe_managed_pls(ec2, ids: Optional[List[str]] = None, next_token: Optional[str] = None) -> Dict:
-    kw: Dict = {}
-    if ids: kw["PrefixListIds"] = ids
-    if next_token: kw["NextToken"] = next_token
+def _describe_managed_pls(ec2, ids: List[str]) -> Dict:
+    try:
+        return ec2.describe_managed_prefix_lists(PrefixListIds=ids)
+    except ClientError:
+        return {"ManagedPrefixLists": []}
+
+def _describe_managed_pls_by_name(ec2, name: str) -> Dict:
     try:
-        return ec2.describe_managed_prefix_lists(**kw)
+        return ec2.describe_managed_prefix_lists(Filters=[{"Name": "prefix-list-name", "Values": [name]}])
     except ClientError:
         return {"ManagedPrefixLists": []}
 
-def _describe_prefix_pls(ec2, next_token: Optional[str] = None) -> Dict:
-    kw: Dict = {}
-    if next_token: kw["NextToken"] = next_token
+def _iter_pls(ec2, operation: str, key: str):
+    """Yield every PL from a paginated describe call; access errors end the scan quietly."""
+    pages = ec2.get_paginator(operation).paginate(PaginationConfig={"PageSize": PAGE_SIZE})
     try:
-        return ec2.describe_prefix_lists(**kw)
+        yield from pages.search(f"{key}[]")
     except ClientError:
-        return {"PrefixLists": []}
+        return
 
 def _list_all_pls(ec2) -> List[Dict]:
     """Merge results from both APIs, dedup by PrefixListId, normalize keys."""
     seen, out = set(), []
 
-    token = None
-    while True:
-        resp = _describe_managed_pls(ec2, next_token=token)
-        for pl in _pls(resp):
-            pid = pl.get("PrefixListId")
-            if pid and pid not in seen:
-                out.append(pl); seen.add(pid)
-        token = resp.get("NextToken")
-        if not token: break
-
-    token = None
-    while True:
-        resp = _describe_prefix_pls(ec2, next_token=token)
-        for pl in _pls(resp):
-            pid = pl.get("PrefixListId")
-            if pid and pid not in seen:
-                out.append({
-                    "PrefixListId": pid,
-                    "PrefixListName": pl.get("PrefixListName"),
-                    "MaxEntries": pl.get("MaxEntries"),
-                    "OwnerId": pl.get("OwnerId"),
-                    "Version": pl.get("Version"),
-                    "State": pl.get("State"),
-                    "PrefixListArn": pl.get("PrefixListArn"),
-                })
-                seen.add(pid)
-        token = resp.get("NextToken")
-        if not token: break
+    for pl in _iter_pls(ec2, "describe_managed_prefix_lists", "ManagedPrefixLists"):
+        pid = pl.get("PrefixListId")
+        if pid and pid not in seen:
+            out.append(pl); seen.add(pid)
+
+    for pl in _iter_pls(ec2, "describe_prefix_lists", "PrefixLists"):
+        pid = pl.get("PrefixListId")
+        if pid and pid not in seen:
+            out.append({
+                "PrefixListId": pid,
+                "PrefixListName": pl.get("PrefixListName"),
+                "MaxEntries": pl.get("MaxEntries"),
+                "OwnerId": pl.get("OwnerId"),
+                "Version": pl.get("Version"),
+                "State": pl.get("State"),
+                "PrefixListArn": pl.get("PrefixListArn"),
+            })
+            seen.add(pid)
 
     return out
 
@@ -169,21 +241,42 @@ def _find_pl(ec2, prefix_list_id: Optional[str], fallback_name: Optional[str]) -
         pls = _pls(resp)
         if pls:
             return pls[0]
-    for pl in _list_all_pls(ec2):
+    if fallback_name:
+        pls = _pls(_describe_managed_pls_by_name(ec2, fallback_name))
+        if pls:
+            return pls[0]
+    # Full scan only for lists the targeted calls can't see (e.g. AWS-managed)
+    all_pls = _list_all_pls(ec2)
+    for pl in all_pls:
         if prefix_list_id and pl.get("PrefixListId") == prefix_list_id:
             return pl
     if fallback_name:
-        for pl in _list_all_pls(ec2):
+        for pl in all_pls:
             if pl.get("PrefixListName") == fallback_name:
                 return pl
     return None
 
+# (region, name) -> PrefixListId for lists configured by name only. Ids never change,
+# so this survives warm invocations; Version is always re-read with a describe-by-id.
+_PL_ID_BY_NAME: Dict[Tuple[str, str], str] = {}
+
 def _describe_pl_with_retries(ec2, prefix_list_id: Optional[str], fallback_name: Optional[str],
                               attempts: int = 8, backoff: float = 0.5) -> Dict:
+    key = (ec2.meta.region_name, fallback_name or "")
+    if not prefix_list_id and fallback_name and key in _PL_ID_BY_NAME:
+        prefix_list_id = _PL_ID_BY_NAME[key]
+        pls = _pls(_describe_managed_pls(ec2, ids=[prefix_list_id]))
+        if pls:
+            return pls[0]
+        _PL_ID_BY_NAME.pop(key, None)
+        prefix_list_id = None
+
     last_seen: List[Dict] = []
     for i in range(attempts):
         pl = _find_pl(ec2, prefix_list_id, fallback_name)
         if pl:
+            if not prefix_list_id and fallback_name and pl.get("PrefixListId"):
+                _PL_ID_BY_NAME[key] = pl["PrefixListId"]
             return pl
         last_seen = _list_all_pls(ec2)
         time.sleep(backoff * (2 ** i))
@@ -198,36 +291,74 @@ def _describe_pl_with_retries(ec2, prefix_list_id: Optional[str], fallback_name:
         f"Visible PLs sample: {json.dumps(preview)}"
     )
 
+# ---------------- Entries hash cache ----------------
+def _cidrs_hash(cidrs: Set[str]) -> str:
+    return hashlib.blake2b("\n".join(sorted(cidrs)).encode("utf-8"), digest_size=16).hexdigest()
+
+def _hash_cache_path(prefix_list_id: str, version: int) -> str:
+    return os.path.join(HASH_CACHE_DIR, f"pl_{prefix_list_id}_v{version}.hash")
+
+def _read_cached_hash(prefix_list_id: str, version: int) -> Optional[str]:
+    try:
+        with open(_hash_cache_path(prefix_list_id, version)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_cached_hash(prefix_list_id: str, version: int, digest: str) -> None:
+    try:
+        with open(_hash_cache_path(prefix_list_id, version), "w") as f:
+            f.write(digest)
+    except OSError:
+        pass
+
 # ---------------- Entries & updates ----------------
-def get_pl_entries(ec2, prefix_list_id: str, fallback_name: Optional[str]) -> Tuple[int, Set[str], int, str]:
+def get_pl_entries(ec2, prefix_list_id: str, fallback_name: Optional[str],
+                   want: Optional[Set[str]] = None) -> Tuple[str, int, Set[str], int, str]:
+    """Return (prefix_list_id, version, entries, max_entries, owner).
+
+    The returned id is the one actually found, so lists configured only by
+    name get a real id for every later call.
+
+    When ``want`` is given and its hash matches the one recorded for the PL's
+    current version, ``want`` is returned as the entries without listing them.
+    """
     pl = _describe_pl_with_retries(ec2, prefix_list_id, fallback_name)
+    prefix_list_id = pl.get("PrefixListId") or prefix_list_id
     version = int(pl.get("Version") or 1)
     max_entries = int(pl.get("MaxEntries") or 0)
     owner = pl.get("OwnerId") or ""
 
+    if want is not None and _read_cached_hash(prefix_list_id, version) == _cidrs_hash(want):
+        return prefix_list_id, version, set(want), max_entries, owner
+
     have: Set[str] = set()
-    token: Optional[str] = None
-    while True:
-        params = {"PrefixListId": prefix_list_id}
-        if token:
-            params["NextToken"] = token
-        resp = ec2.get_managed_prefix_list_entries(**params)
-        for e in (resp.get("Entries") or []):
-            cidr = e.get("Cidr")
-            if cidr:
-                have.add(cidr)
-        token = resp.get("NextToken")
-        if not token:
-            break
-    return version, have, max_entries, owner
-
-def _chunks(seq: List[Dict], n: int):
-    for i in range(0, len(seq), n):
-        yield seq[i:i + n]
-
-def apply_delta(ec2, prefix_list_id: str, desc: str, want_list: List[str],
+    pages = ec2.get_paginator("get_managed_prefix_list_entries").paginate(
+        PrefixListId=prefix_list_id, PaginationConfig={"PageSize": PAGE_SIZE}
+    )
+    for cidr in pages.search("Entries[].Cidr"):
+        if cidr:
+            have.add(_norm_cidr(cidr))
+    return prefix_list_id, version, have, max_entries, owner
+
+def _batches(adds: List[Dict], rems: List[Dict], n: int):
+    """Yield (add_slice, rem_slice) pairs with at most n entries combined.
+
+    Removals are packed first so a nearly full list never overshoots MaxEntries mid-update.
+    """
+    ai, ri = 0, 0
+    while ai < len(adds) or ri < len(rems):
+        rem_batch = rems[ri:ri + n]
+        ri += len(rem_batch)
+        add_batch = adds[ai:ai + n - len(rem_batch)]
+        ai += len(add_batch)
+        yield add_batch, rem_batch
+
+def apply_delta(ec2, prefix_list_id: str, desc: str, want: Set[str],
                 fallback_name: Optional[str], account_owner: str) -> Dict:
-    current_version, have, max_entries, owner = get_pl_entries(ec2, prefix_list_id, fallback_name)
+    prefix_list_id, current_version, have, max_entries, owner = get_pl_entries(
+        ec2, prefix_list_id, fallback_name, want
+    )
 
     # Skip AWS-managed lists (owner != your account)
     if owner and owner != account_owner:
@@ -241,18 +372,17 @@ def apply_delta(ec2, prefix_list_id: str, desc: str, want_list: List[str],
             "note": f"OWNER={owner} != {account_owner}. Lista AWS-managed; se omite modificación."
         }
 
-    want: Set[str] = set(want_list)
-
     if max_entries and len(want) > max_entries:
         raise RuntimeError(
             f"Desired entries ({len(want)}) exceed MaxEntries ({max_entries}) for {prefix_list_id}. "
             f"Increase 'max_entries' in Terraform and re-apply."
         )
 
-    to_add = sorted(want - have)
-    to_remove = sorted(have - want)
+    to_add = list(want - have)
+    to_remove = list(have - want)
 
     if not to_add and not to_remove:
+        _write_cached_hash(prefix_list_id, current_version, _cidrs_hash(want))
         return {
             "id": prefix_list_id,
             "from_version": current_version,
@@ -263,15 +393,16 @@ def apply_delta(ec2, prefix_list_id: str, desc: str, want_list: List[str],
             "summary": f"{prefix_list_id}: up to date ({len(have)} entries)"
         }
 
-    adds = [{"Cidr": c, "Description": (desc or DESCR_DEFAULT)[:PL_DESCR_TRUNC]} for c in to_add]
+    description = (desc or DESCR_DEFAULT)[:PL_DESCR_TRUNC]
+    adds = [{"Cidr": c, "Description": description} for c in to_add]
     rems = [{"Cidr": c} for c in to_remove]
 
-    add_batches = list(_chunks(adds, MAX_BATCH))
-    rem_batches = list(_chunks(rems, MAX_BATCH))
-
     version = current_version
 
+    retried = False  # a conflict retry re-sends a delta computed against a stale `have`
+
     def _modify(add_batch: Optional[List[Dict]], rem_batch: Optional[List[Dict]], version_hint: int) -> int:
+        nonlocal retried
         kwargs: Dict = {"PrefixListId": prefix_list_id, "CurrentVersion": version_hint}
         if add_batch:
             kwargs["AddEntries"] = add_batch
@@ -282,22 +413,26 @@ def apply_delta(ec2, prefix_list_id: str, desc: str, want_list: List[str],
             resp = ec2.modify_managed_prefix_list(**kwargs)
             return resp["PrefixList"]["Version"]
         except ClientError as e:
-            msg = str(e)
+            msg = e.response.get("Error", {}).get("Message") or str(e)
             if "CurrentVersion" in msg or "version" in msg.lower():
-                fresh = _describe_pl_with_retries(ec2, prefix_list_id, fallback_name)
-                fresh_ver = int(fresh.get("Version") or version_hint)
+                # Prefer the version EC2 reports in the error over re-listing every PL
+                m = _CURRENT_VERSION_RE.search(msg)
+                fresh_ver = int(m.group(1)) if m else None
+                if fresh_ver is None or fresh_ver == version_hint:
+                    # No usable version in the message (or it echoes ours back): describe instead
+                    fresh = _describe_pl_with_retries(ec2, prefix_list_id, fallback_name)
+                    fresh_ver = int(fresh.get("Version") or version_hint)
                 kwargs["CurrentVersion"] = fresh_ver
+                retried = True
                 resp = ec2.modify_managed_prefix_list(**kwargs)
                 return resp["PrefixList"]["Version"]
             raise
 
-    ai, ri = 0, 0
-    while ai < len(add_batches) or ri < len(rem_batches):
-        add_batch = add_batches[ai] if ai < len(add_batches) else None
-        rem_batch = rem_batches[ri] if ri < len(rem_batches) else None
+    for add_batch, rem_batch in _batches(adds, rems, MAX_BATCH):
         version = _modify(add_batch, rem_batch, version)
-        if ai < len(add_batches): ai += 1
-        if ri < len(rem_batches): ri += 1
+    # After a concurrent write the result may not equal `want`; let the next run list and verify
+    if not retried:
+        _write_cached_hash(prefix_list_id, version, _cidrs_hash(want))
 
     return {
         "id": prefix_list_id,
@@ -327,9 +462,9 @@ def notify_slack(webhook: str, account: str, default_region: str, results: List[
         if changed:
             lines.append(f"• `{id_}`: cambios  (+{len(added)}/-{len(removed)})")
             if added:
-                lines.append(f"   + {summarize_items(added)}")
+                lines.append(f"   + {summarize_items(_sorted_cidrs(added))}")
             if removed:
-                lines.append(f"   - {summarize_items(removed)}")
+                lines.append(f"   - {summarize_items(_sorted_cidrs(removed))}")
         else:
             note = r.get("summary") or r.get("note") or "sin cambios"
             lines.append(f"• `{id_}`: {note}")
@@ -337,7 +472,7 @@ def notify_slack(webhook: str, account: str, default_region: str, results: List[
     text = "\n".join(lines)
     payload = {"text": text}
     try:
-        code, body = http_post_json(webhook, payload, timeout=10)
+        code, _ = http_post_json(webhook, payload, timeout=10)
         # opcional: no imprimir el webhook ni el body completo (para evitar exponer info)
         print(json.dumps({"slack_status": code}, ensure_ascii=False))
     except Exception as e:
@@ -363,14 +498,29 @@ def handler(event, context):
     # Fetch desired Cloudflare CIDRs
     v4, v6 = fetch_cloudflare_ips()
 
-    # Compute per-list deltas
-    results: List[Dict] = []
+    # Compute per-list deltas (v4 and v6 run in parallel; boto3 clients are thread-safe)
+    tasks: List[Tuple] = []
     if pl4_id or pl4_name:
-        ec2_v4 = make_ec2(r4)
-        results.append(apply_delta(ec2_v4, pl4_id or "", desc, v4, pl4_name, acct))
+        tasks.append((make_ec2(r4), pl4_id or "", desc, v4, pl4_name, acct))
     if pl6_id or pl6_name:
-        ec2_v6 = make_ec2(r6)
-        results.append(apply_delta(ec2_v6, pl6_id or "", desc, v6, pl6_name, acct))
+        tasks.append((make_ec2(r6), pl6_id or "", desc, v6, pl6_name, acct))
+
+    results: List[Dict] = []
+    errors: List[Exception] = []
+    if tasks:
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            futures = [ex.submit(apply_delta, *t) for t in tasks]
+        # One list failing must not abort the other; collect and re-raise at the end
+        for t, f in zip(tasks, futures):
+            try:
+                results.append(f.result())
+            except Exception as e:
+                errors.append(e)
+                results.append({
+                    "id": t[1] or t[4] or "N/A",
+                    "changed": False,
+                    "error": str(e),
+                })
 
     out = {
         "account": acct,
@@ -380,7 +530,11 @@ def handler(event, context):
             "v6": r6 if (pl6_id or pl6_name) else None
         },
         "counts": {"v4": len(v4), "v6": len(v6)},
-        "result": results,
+        # Full lists go to Slack below; the logged/returned copy is bounded
+        "result": [
+            {**r, "added": cap_items(r["added"]), "removed": cap_items(r["removed"])} if r.get("changed") else r
+            for r in results
+        ],
     }
 
     # === Only notify Slack when there were changes ===
@@ -392,6 +546,8 @@ def handler(event, context):
             print(json.dumps({"slack_skipped": "no changes"}, ensure_ascii=False))
 
     print(json.dumps(out, separators=(",", ":"), ensure_ascii=False))
+    if errors:
+        raise errors[0]
     return out
 
 # ---------------- Local run ----------------